@@ -19,18 +19,36 @@ if [ -z "$FORK_BLOCK" ]; then
     exit 1
 fi
 
+# Validate inputs before touching any config file, so a typo fails here instead
+# of producing a half-patched genesis.json
+if ! [[ "$FORK_BLOCK" =~ ^[0-9]+$ ]]; then
+    echo " ❌ FORK_BLOCK must be a decimal block number, got: $FORK_BLOCK"
+    exit 1
+fi
+if ! [[ "$PARENT_HASH" =~ ^0x[0-9a-fA-F]{64}$ ]]; then
+    echo " ❌ PARENT_HASH must be a 0x-prefixed 32-byte hex hash, got: $PARENT_HASH"
+    exit 1
+fi
+
 echo "🔧 Setting fork block and parent hash in genesis.json ..."
-FORK_BLOCK_HEX=$(printf "0x%x" "$FORK_BLOCK")
-sed_inplace '/"config": {/,/}/ s/"optimism": {/"legacyXLayerBlock": '"$((FORK_BLOCK + 1))"',\n    "optimism": {/' ./config-op/genesis.json
-sed_inplace 's/"parentHash": "0x0000000000000000000000000000000000000000000000000000000000000000"/"parentHash": "'"$PARENT_HASH"'"/' ./config-op/genesis.json
-sed_inplace '/"70997970c51812dc3a010c7d01b50e0d17dc79c8": {/,/}/ s/"balance": "[^"]*"/"balance": "0x446c3b15f9926687d2c40534fdb564000000000000"/' ./config-op/genesis.json
-sed_inplace 's/"eip1559DenominatorCanyon": [0-9]*/"eip1559DenominatorCanyon": '"$(jq -r '.config.optimism.eip1559Denominator' ./config-op/genesis.json)"'/' ./config-op/genesis.json
 NEXT_BLOCK_NUMBER=$((FORK_BLOCK + 1))
 NEXT_BLOCK_NUMBER_HEX=$(printf "0x%x" "$NEXT_BLOCK_NUMBER")
-sed_inplace 's/"number": 0/"number": '"$NEXT_BLOCK_NUMBER"'/' ./config-op/rollup.json
-sed_inplace 's/"eip1559Elasticity": [0-9]*/"eip1559Elasticity": '"$(jq -r '.config.optimism.eip1559Elasticity' ./config-op/genesis.json)"'/' ./config-op/rollup.json
-sed_inplace 's/"eip1559Denominator": [0-9]*/"eip1559Denominator": '"$(jq -r '.config.optimism.eip1559Denominator' ./config-op/genesis.json)"'/' ./config-op/rollup.json
-sed_inplace 's/"eip1559DenominatorCanyon": [0-9]*/"eip1559DenominatorCanyon": '"$(jq -r '.config.optimism.eip1559DenominatorCanyon' ./config-op/genesis.json)"'/' ./config-op/rollup.json
+# Read the EIP-1559 params once. The Canyon denominator is pinned to the base
+# denominator in both genesis.json and rollup.json, so it needs no separate read.
+read -r EIP1559_ELASTICITY EIP1559_DENOMINATOR <<< "$(jq -r '.config.optimism | [.eip1559Elasticity, .eip1559Denominator] | @tsv' ./config-op/genesis.json)"
+# Apply all genesis.json patches in a single sed pass instead of rewriting the file once per field
+sed_inplace \
+  -e '/"config": {/,/}/ s/"optimism": {/"legacyXLayerBlock": '"$NEXT_BLOCK_NUMBER"',\n    "optimism": {/' \
+  -e 's/"parentHash": "0x0000000000000000000000000000000000000000000000000000000000000000"/"parentHash": "'"$PARENT_HASH"'"/' \
+  -e '/"70997970c51812dc3a010c7d01b50e0d17dc79c8": {/,/}/ s/"balance": "[^"]*"/"balance": "0x446c3b15f9926687d2c40534fdb564000000000000"/' \
+  -e 's/"eip1559DenominatorCanyon": [0-9]*/"eip1559DenominatorCanyon": '"$EIP1559_DENOMINATOR"'/' \
+  ./config-op/genesis.json
+sed_inplace \
+  -e 's/"number": 0/"number": '"$NEXT_BLOCK_NUMBER"'/' \
+  -e 's/"eip1559Elasticity": [0-9]*/"eip1559Elasticity": '"$EIP1559_ELASTICITY"'/' \
+  -e 's/"eip1559Denominator": [0-9]*/"eip1559Denominator": '"$EIP1559_DENOMINATOR"'/' \
+  -e 's/"eip1559DenominatorCanyon": [0-9]*/"eip1559DenominatorCanyon": '"$EIP1559_DENOMINATOR"'/' \
+  ./config-op/rollup.json
 
 # 🔧 Seed the deterministic CREATE2 deploy factory into the L2 genesis. ALWAYS injected: it is a
 # generic stateless CREATE2 deployer used by DeployXlayerGaslessWhitelist.s.sol.
@@ -53,10 +71,10 @@ if [ "$MERGE_RETH_GENESIS" = "true" ]; then
     sed_inplace "s/FORK_BLOCK=.*/FORK_BLOCK=$FORK_BLOCK/" .env
     jq '.genesis.l2.number = '"$((FORK_BLOCK+1))" ./config-op/rollup.json > tmp.json && mv tmp.json ./config-op/rollup.json
 else
-    # Create genesis-reth.json from genesis.json
+    # Create genesis-reth.json from genesis.json, patching the number token while
+    # streaming the copy (a single read + write instead of cp followed by sed -i)
     echo "🔧 Creating genesis-reth.json from genesis.json ..."
-    cp ./config-op/genesis.json ./config-op/genesis-reth.json
-    sed_inplace 's/"number": "0x0"/"number": "'"$NEXT_BLOCK_NUMBER_HEX"'"/' ./config-op/genesis-reth.json
+    sed 's/"number": "0x0"/"number": "'"$NEXT_BLOCK_NUMBER_HEX"'"/' ./config-op/genesis.json > ./config-op/genesis-reth.json
 fi
 
 # Extract contract addresses from state.json and update .env file
@@ -374,7 +392,12 @@ fi
 echo "✅ Finished init op-$SEQ_TYPE-seq and op-$RPC_TYPE-rpc."
 
 # genesis.json is too large to embed in go, so we compress it now and decompress it in go code
-gzip -c config-op/genesis.json > config-op/genesis.json.gz
+# (pigz compresses on all cores and produces a standard gzip stream)
+if command -v pigz &>/dev/null; then
+    pigz -c config-op/genesis.json > config-op/genesis.json.gz
+else
+    gzip -c config-op/genesis.json > config-op/genesis.json.gz
+fi
 
 # Check if MIN_RUN mode is enabled
 if [ "$MIN_RUN" = "true" ]; then
@@ -5,8 +5,17 @@ Test script to verify flashblock transactions are preserved across sequencer/bui
 This script monitors flashblocks via WebSocket and verifies that all flashblock transactions
 (index > 0) eventually appear in canonical blocks, even after a sequencer/builder switch.
 
+Transaction hashes are taken from the flashblock metadata (`tx_hashes`, or the tx-hash keys
+of `receipts`) when the builder provides one per transaction; raw transactions are only
+keccak-hashed as a fallback.
+
+Canonical blocks are polled over HTTP RPC. With --rpc-ws-url the script also subscribes to
+`newHeads` and checks each block as soon as it is sealed; polling then only runs as a slow
+fallback for missed notifications.
+
 Usage:
-    python test_flashblock_reorg_mitigation.py [--ws-url URL] [--rpc-url URL] [--duration SECONDS] [--verbose]
+    python test_flashblock_reorg_mitigation.py [--ws-url URL] [--rpc-url URL] [--rpc-ws-url URL]
+                                               [--duration SECONDS] [--verbose]
 
 Example:
     python test_flashblock_reorg_mitigation.py --ws-url ws://localhost:11111 --rpc-url http://localhost:8124
@@ -14,13 +23,16 @@ Example:
 
 import argparse
 import asyncio
+import functools
 import json
 import signal
 import sys
 import time
+import traceback
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import DefaultDict, Deque, Dict, List, Optional, Set, Union
 from urllib.error import URLError
 from urllib.request import Request, urlopen
 
@@ -37,41 +49,81 @@ try:
 except ImportError:
     HAS_RLP = False
 
+# Optional: a pooled keep-alive HTTP client for RPC calls (falls back to urllib
+# running in a worker thread, which still keeps the event loop unblocked)
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Optional: orjson decodes flashblock messages several times faster than json.
+# Its JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Optional: uvloop's event loop lowers per-message overhead on the WS receive path
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+
+
+# keccak256(b"") - used to reject backends that silently compute FIPS-202 SHA3-256.
+# (hashlib.sha3_256 is such a backend: SHA3 pads differently from Ethereum's keccak.)
+_KECCAK256_EMPTY = bytes.fromhex(
+    "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+)
 
 
 def _get_keccak256_impl():
-    """Find and return a keccak256 implementation."""
-    # Try pycryptodome
+    """Find and return the fastest available keccak256 implementation.
+
+    Every tracked flashblock transaction is hashed once, so backends are tried
+    in order of per-call overhead and each one is checked against a known digest.
+    """
+    candidates = []
+
+    # Try pysha3 (thin binding over the XKCP optimized Keccak cores)
     try:
-        from Crypto.Hash import keccak
+        import sha3
+        _keccak_256 = sha3.keccak_256
         def _keccak256(data: bytes) -> bytes:
-            k = keccak.new(digest_bits=256)
-            k.update(data)
-            return k.digest()
-        return _keccak256
+            return _keccak_256(data).digest()
+        candidates.append(_keccak256)
     except ImportError:
         pass
 
-    # Try eth-hash
+    # Try pycryptodome (construct the hash object directly, skipping the
+    # keyword-argument parsing done by keccak.new() on every call)
     try:
-        from eth_hash.auto import keccak as eth_keccak
+        from Crypto.Hash import keccak
+        _keccak_hash = keccak.Keccak_Hash
         def _keccak256(data: bytes) -> bytes:
-            return eth_keccak(data)
-        return _keccak256
+            return _keccak_hash(data, 32, False).digest()
+        candidates.append(_keccak256)
     except ImportError:
         pass
 
-    # Try pysha3
+    # Try eth-hash
     try:
-        import sha3
-        def _keccak256(data: bytes) -> bytes:
-            k = sha3.keccak_256()
-            k.update(data)
-            return k.digest()
-        return _keccak256
+        from eth_hash.auto import keccak as eth_keccak
+        candidates.append(eth_keccak)
     except ImportError:
         pass
 
+    for impl in candidates:
+        try:
+            if impl(b"") == _KECCAK256_EMPTY:
+                return impl
+        except Exception:
+            continue
+
     # No implementation found
     return None
 
@@ -94,33 +146,97 @@ if _keccak256_impl is None:
     sys.exit(1)
 
 
-def keccak256(data: bytes) -> bytes:
-    """Compute keccak256 hash."""
-    return _keccak256_impl(data)
-
-
 _decode_error_logged = False
 
-def decode_tx_hash(raw_tx_hex: str) -> Optional[str]:
-    """Decode transaction hash from RLP-encoded hex string."""
+# A raw transaction: RLP bytes as-is, or their hex encoding as sent in JSON
+RawTx = Union[str, bytes]
+
+def _log_decode_error(raw_tx: RawTx, e: Exception):
+    """Log the first transaction decode failure only."""
     global _decode_error_logged
+    if not _decode_error_logged:
+        preview = raw_tx if isinstance(raw_tx, str) else bytes(raw_tx).hex()
+        print(f"\nWARNING: Transaction decode failed: {type(e).__name__}: {e}")
+        print(f"  Raw tx (first 100 chars): {preview[:100]}...")
+        print("  Make sure pycryptodome is installed: pip install pycryptodome\n")
+        _decode_error_logged = True
+
+
+def decode_tx_hashes(
+    raw_txs: List[RawTx],
+    _keccak=_keccak256_impl,
+    _fromhex=bytes.fromhex,
+) -> List[Optional[bytes]]:
+    """Return the keccak256 digests of a flashblock diff's RLP-encoded transactions.
+
+    Binary transactions are hashed as-is; only hex strings go through bytes.fromhex.
+    None marks a decode failure. The whole diff is decoded in one call, and the hash
+    function and hex decoder are bound as default arguments so the loop reads them
+    as locals instead of going through module/builtin lookups.
+    """
+    hashes: List[Optional[bytes]] = []
+    append = hashes.append
+
+    for raw_tx in raw_txs:
+        try:
+            if isinstance(raw_tx, str):
+                # Remove 0x/0X prefix if present (slice compare avoids a method call)
+                if raw_tx[:2] in ("0x", "0X"):
+                    raw_tx = raw_tx[2:]
+                raw_tx = _fromhex(raw_tx)
+            # Transaction hash is keccak256 of the RLP-encoded transaction
+            append(_keccak(raw_tx))
+        except Exception as e:
+            _log_decode_error(raw_tx, e)
+            append(None)
+
+    return hashes
+
+
+@functools.lru_cache(maxsize=1024)
+def _hex_to_int(value: str) -> int:
+    """Parse a 0x-prefixed hex quantity; block numbers repeat across flashblocks and polls."""
+    return int(value, 16)
+
+
+def format_tx_hash(tx_hash: bytes) -> str:
+    """Format a 32-byte transaction hash as 0x-prefixed hex for logging."""
+    return "0x" + tx_hash.hex()
+
+
+def parse_tx_hash(tx_hash_hex: str) -> bytes:
+    """Parse a 0x-prefixed hex transaction hash into its 32-byte digest."""
+    return bytes.fromhex(tx_hash_hex[2:])
+
+
+def metadata_tx_hashes(metadata: dict, tx_count: int) -> Optional[List[bytes]]:
+    """Return the diff's transaction hashes if the builder published them in metadata.
+
+    Accepts a `tx_hashes` list, or `receipts` either keyed by tx hash (op-rbuilder)
+    or given as a list of receipt objects. Returns None unless there is exactly
+    one well-formed hash per raw transaction, so the caller can fall back to
+    hashing the raw transactions itself.
+    """
+    hashes = metadata.get("tx_hashes")
+    if hashes is None:
+        receipts = metadata.get("receipts")
+        if isinstance(receipts, dict):
+            hashes = list(receipts)
+        elif isinstance(receipts, list):
+            hashes = [
+                r.get("transactionHash") or r.get("transaction_hash")
+                for r in receipts if isinstance(r, dict)
+            ]
+
+    if not isinstance(hashes, list) or len(hashes) != tx_count:
+        return None
     try:
-        # Remove 0x prefix if present
-        if raw_tx_hex.startswith("0x"):
-            raw_tx_hex = raw_tx_hex[2:]
-
-        raw_bytes = bytes.fromhex(raw_tx_hex)
-
-        # Transaction hash is keccak256 of the RLP-encoded transaction
-        tx_hash = keccak256(raw_bytes)
-        return "0x" + tx_hash.hex()
-    except Exception as e:
-        if not _decode_error_logged:
-            print(f"\nWARNING: Transaction decode failed: {type(e).__name__}: {e}")
-            print(f"  Raw tx (first 100 chars): {raw_tx_hex[:100]}...")
-            print("  Make sure pycryptodome is installed: pip install pycryptodome\n")
-            _decode_error_logged = True
+        digests = [parse_tx_hash(h) for h in hashes]
+    except (TypeError, ValueError):
         return None
+    if not all(len(d) == 32 for d in digests):
+        return None
+    return digests
 
 
 class TxStatus(Enum):
@@ -129,31 +245,39 @@ class TxStatus(Enum):
     MISSING = "missing"
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackedTransaction:
-    tx_hash: str
+    # slots: one instance per tracked tx, so skip the per-instance __dict__.
+    # Instances live as dict values keyed by tx_hash and are never hashed.
+    tx_hash: bytes
     parent_hash: str
     flashblock_index: int
     block_number: int  # Expected block number
     first_seen_at: float
     status: TxStatus = TxStatus.PENDING
 
-    def __hash__(self):
-        return hash(self.tx_hash)
-
 
 @dataclass
 class BlockTracker:
     """Tracks flashblock transactions and canonical block confirmations."""
 
+    # Transaction hashes are kept as raw 32-byte digests (half the size of the
+    # 0x-hex form); format_tx_hash() converts them back for logging only.
+
     # All tracked transactions: tx_hash -> TrackedTransaction
-    transactions: Dict[str, TrackedTransaction] = field(default_factory=dict)
+    transactions: Dict[bytes, TrackedTransaction] = field(default_factory=dict)
 
     # Transactions grouped by expected block number: block_number -> set of tx_hashes
-    txs_by_block: Dict[int, Set[str]] = field(default_factory=dict)
+    txs_by_block: DefaultDict[int, Set[bytes]] = field(
+        default_factory=lambda: defaultdict(set)
+    )
+
+    # Keys of txs_by_block in insertion order. Block numbers only grow, so
+    # finalization pops from the left instead of scanning every pending block.
+    block_order: Deque[int] = field(default_factory=deque)
 
     # Canonical blocks we've seen: block_number -> set of tx_hashes in that block
-    canonical_blocks: Dict[int, Set[str]] = field(default_factory=dict)
+    canonical_blocks: Dict[int, Set[bytes]] = field(default_factory=dict)
 
     # Latest canonical block number
     latest_canonical_block: int = 0
@@ -186,9 +310,11 @@ class FlashblockReorgTester:
         rpc_url: str,
         duration: Optional[int] = None,
         verbose: bool = False,
+        rpc_ws_url: Optional[str] = None,
     ):
         self.ws_urls = ws_urls
         self.rpc_url = rpc_url
+        self.rpc_ws_url = rpc_ws_url
         self.duration = duration
         self.verbose = verbose
         self.tracker = BlockTracker()
@@ -200,6 +326,21 @@ class FlashblockReorgTester:
         self.current_block_number: Optional[int] = None
         self.current_payload_id: Optional[str] = None
 
+        # Shared RPC session, created in run() when aiohttp is available
+        self._http: Optional["aiohttp.ClientSession"] = None
+
+        # Cleared once the node rejects a batched request
+        self._rpc_batch_supported = True
+
+        # True while the newHeads subscription is live; polling backs off meanwhile
+        self._heads_subscribed = False
+
+        # Serializes _finalize_old_blocks across check_canonical_block callers
+        self._finalize_lock = asyncio.Lock()
+
+        # Only the first flashblock processing traceback is logged
+        self._tb_logged = False
+
     def log(self, message: str, force: bool = False):
         """Log message if verbose mode or forced."""
         if self.verbose or force:
@@ -210,29 +351,101 @@ class FlashblockReorgTester:
         """Always log this message."""
         self.log(message, force=True)
 
-    def get_block_from_rpc(self, block_id: str = "latest") -> Optional[dict]:
-        """Fetch block from RPC endpoint."""
+    def _rpc_call_sync(self, payload):
+        """POST a JSON-RPC payload with urllib (blocking; run in a thread)."""
+        req = Request(
+            self.rpc_url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urlopen(req, timeout=10) as response:
+            return _json_loads(response.read())
+
+    async def _rpc_call(self, payload):
+        """POST a JSON-RPC payload without blocking the event loop."""
+        if self._http is not None:
+            async with self._http.post(self.rpc_url, json=payload) as response:
+                return await response.json(loads=_json_loads, content_type=None)
+        return await asyncio.to_thread(self._rpc_call_sync, payload)
+
+    async def get_block_from_rpc(self, block_id: str = "latest", full: bool = False) -> Optional[dict]:
+        """Fetch block from RPC endpoint (tx hashes only unless full=True)."""
         try:
             payload = {
                 "jsonrpc": "2.0",
                 "id": 1,
                 "method": "eth_getBlockByNumber",
-                "params": [block_id, True],  # True = include full tx objects
+                "params": [block_id, full],  # full = include full tx objects
             }
-            req = Request(
-                self.rpc_url,
-                data=json.dumps(payload).encode("utf-8"),
-                headers={"Content-Type": "application/json"},
-            )
-            with urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode("utf-8"))
-                return data.get("result")
+            data = await self._rpc_call(payload)
+            return data.get("result")
         except (URLError, Exception) as e:
             self.log(f"RPC Error: {e}")
             return None
 
-    def process_flashblock_payload(self, payload: dict, source_url: str = "unknown"):
-        """Process a flashblock payload and track transactions."""
+    async def get_blocks_from_rpc(
+        self, block_numbers: List[int], full: bool = False
+    ) -> Dict[int, dict]:
+        """Fetch several blocks (tx hashes only unless full=True) in one batched JSON-RPC request.
+
+        Returns block_number -> block for every block the node returned.
+        """
+        if not block_numbers:
+            return {}
+
+        if not self._rpc_batch_supported:
+            return await self._get_blocks_one_by_one(block_numbers, full)
+
+        try:
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": i,
+                    "method": "eth_getBlockByNumber",
+                    "params": [hex(bn), full],  # full = include full tx objects
+                }
+                for i, bn in enumerate(block_numbers)
+            ]
+            data = await self._rpc_call(payload)
+        except (URLError, Exception) as e:
+            self.log(f"RPC Error: {e}")
+            return {}
+
+        if not isinstance(data, list):
+            # Batching disabled or over the node's batch limit: use single requests
+            # from now on, as the node's reply to a batch won't change
+            self.log_always(
+                f"RPC batch request rejected ({data}), falling back to one request per block"
+            )
+            self._rpc_batch_supported = False
+            return await self._get_blocks_one_by_one(block_numbers, full)
+
+        # Responses may come back in any order; scatter them by id
+        blocks = {}
+        for response in data:
+            if not isinstance(response, dict):
+                continue
+            i = response.get("id")
+            result = response.get("result")
+            if isinstance(i, int) and 0 <= i < len(block_numbers) and result:
+                blocks[block_numbers[i]] = result
+        return blocks
+
+    async def _get_blocks_one_by_one(
+        self, block_numbers: List[int], full: bool = False
+    ) -> Dict[int, dict]:
+        """Fetch blocks with one (concurrent) request each, for nodes without batch support."""
+        results = await asyncio.gather(
+            *(self.get_block_from_rpc(hex(bn), full) for bn in block_numbers)
+        )
+        return {bn: block for bn, block in zip(block_numbers, results) if block}
+
+    async def process_flashblock_payload(self, payload: dict, source_url: str = "unknown"):
+        """Process a flashblock payload and track transactions.
+
+        Block context is taken from the payload before any await, and raw txs are
+        hashed in a worker thread; tracker state is only mutated on the event loop.
+        """
         try:
             payload_id = payload.get("payload_id")
             index = payload.get("index", 0)
@@ -240,7 +453,7 @@ class FlashblockReorgTester:
             diff = payload.get("diff", {})
             metadata = payload.get("metadata", {})
 
-            # Get transactions from diff (RLP-encoded hex strings)
+            # Get transactions from diff (RLP-encoded; hex strings or raw bytes)
             raw_transactions = diff.get("transactions", [])
 
             self.tracker.total_flashblocks_received += 1
@@ -249,7 +462,7 @@ class FlashblockReorgTester:
             if index == 0 and base:
                 self.current_parent_hash = base.get("parent_hash")
                 block_number_hex = base.get("block_number", "0x0")
-                self.current_block_number = int(block_number_hex, 16)
+                self.current_block_number = _hex_to_int(block_number_hex)
                 self.current_payload_id = payload_id
                 self.log(
                     f"[{source_url}] New pending block #{self.current_block_number} "
@@ -276,33 +489,45 @@ class FlashblockReorgTester:
                 )
                 return
 
-            # Decode transaction hashes from RLP
+            # Use the hashes published in metadata when available; keccak over
+            # the RLP-encoded transactions is only the fallback
+            tx_hashes = metadata_tx_hashes(metadata, len(raw_transactions))
+            if tx_hashes is None:
+                # keccak is CPU-bound: keep it off the loop so the other
+                # WebSocket readers and the canonical poller keep running
+                tx_hashes = (
+                    await asyncio.to_thread(decode_tx_hashes, raw_transactions)
+                    if raw_transactions else []
+                )
+
             now = time.time()
             new_txs = 0
             decode_failures = 0
+            transactions = self.tracker.transactions
+            is_new_block = block_number not in self.tracker.txs_by_block
+            block_set = self.tracker.txs_by_block[block_number]
 
-            for raw_tx in raw_transactions:
-                tx_hash = decode_tx_hash(raw_tx)
+            for tx_hash in tx_hashes:
                 if not tx_hash:
                     decode_failures += 1
                     continue
 
-                if tx_hash not in self.tracker.transactions:
-                    tracked_tx = TrackedTransaction(
-                        tx_hash=tx_hash,
-                        parent_hash=parent_hash,
-                        flashblock_index=index,
-                        block_number=block_number,
-                        first_seen_at=now,
-                    )
-                    self.tracker.transactions[tx_hash] = tracked_tx
+                # A single probe for the common duplicate case (the same
+                # flashblock arrives from every subscribed WebSocket)
+                if tx_hash in transactions:
+                    continue
 
-                    if block_number not in self.tracker.txs_by_block:
-                        self.tracker.txs_by_block[block_number] = set()
-                    self.tracker.txs_by_block[block_number].add(tx_hash)
+                transactions[tx_hash] = TrackedTransaction(
+                    tx_hash=tx_hash,
+                    parent_hash=parent_hash,
+                    flashblock_index=index,
+                    block_number=block_number,
+                    first_seen_at=now,
+                )
+                block_set.add(tx_hash)
 
-                    self.tracker.total_txs_tracked += 1
-                    new_txs += 1
+                self.tracker.total_txs_tracked += 1
+                new_txs += 1
 
             msg = (
                 f"[{source_url}] Flashblock idx={index} for block #{block_number}: "
@@ -313,84 +538,119 @@ class FlashblockReorgTester:
             self.log(msg)
 
             if new_txs > 0:
+                if is_new_block:
+                    self.tracker.block_order.append(block_number)
                 self.log(
                     f"Block #{block_number} idx={index}: +{new_txs} txs tracked "
-                    f"(total: {len(self.tracker.txs_by_block.get(block_number, set()))})"
+                    f"(total: {len(block_set)})"
                 )
+            elif not block_set:
+                # Only blocks with tracked txs need finalizing
+                del self.tracker.txs_by_block[block_number]
 
         except Exception as e:
             self.log(f"Error processing flashblock: {e}")
-            import traceback
-            self.log(traceback.format_exc())
-
-    def check_canonical_block(self, block: dict):
+            # Format the stack only once, and only when it would be printed
+            if self.verbose and not self._tb_logged:
+                self.log(traceback.format_exc())
+                self._tb_logged = True
+
+    def _record_canonical_block(self, block: dict):
+        """Store a canonical block's tx hashes without finalizing anything."""
+        block_number = _hex_to_int(block.get("number", "0x0"))
+        # Hash-only blocks (the default) list hex hashes; full=True ones list tx objects
+        transactions = block.get("transactions", [])
+        self.tracker.canonical_blocks[block_number] = {
+            parse_tx_hash(tx if isinstance(tx, str) else tx["hash"])
+            for tx in transactions
+        }
+
+        if block_number > self.tracker.latest_canonical_block:
+            self.tracker.latest_canonical_block = block_number
+
+    async def check_canonical_block(self, block: dict):
         """Check a canonical block and update transaction statuses."""
         try:
-            block_number = int(block.get("number", "0x0"), 16)
-            block_hash = block.get("hash", "unknown")
-            transactions = block.get("transactions", [])
-
-            # Get tx hashes from canonical block
-            canonical_tx_hashes = set()
-            for tx in transactions:
-                if isinstance(tx, str):
-                    canonical_tx_hashes.add(tx)
-                elif isinstance(tx, dict):
-                    canonical_tx_hashes.add(tx.get("hash", ""))
-
-            self.tracker.canonical_blocks[block_number] = canonical_tx_hashes
-
-            if block_number > self.tracker.latest_canonical_block:
-                self.tracker.latest_canonical_block = block_number
-                tracked_for_block = len(self.tracker.txs_by_block.get(block_number, set()))
+            self._record_canonical_block(block)
 
-            # Check if we can finalize any older blocks
-            self._finalize_old_blocks()
+            # Check if we can finalize any older blocks. The poller and the newHeads
+            # subscription both get here, and finalization awaits RPC between popping
+            # and re-queueing blocks, so only one pass may run at a time.
+            async with self._finalize_lock:
+                await self._finalize_old_blocks()
 
         except Exception as e:
             self.log(f"Error checking canonical block: {e}")
 
-    def _finalize_old_blocks(self):
+    async def _finalize_old_blocks(self):
         """Mark transactions as confirmed or missing for blocks that are finalized."""
         finalization_threshold = (
             self.tracker.latest_canonical_block - self.tracker.blocks_to_confirm_after
         )
 
-        blocks_to_check = [
-            bn for bn in list(self.tracker.txs_by_block.keys())
-            if bn <= finalization_threshold
+        block_order = self.tracker.block_order
+        blocks_to_check = []
+        while block_order and block_order[0] <= finalization_threshold:
+            blocks_to_check.append(block_order.popleft())
+
+        try:
+            await self._finalize_blocks(blocks_to_check)
+        finally:
+            # Finalized blocks are dropped from txs_by_block; put the rest back at
+            # the front in order (canonical block unavailable, or an error part-way)
+            block_order.extendleft(reversed([
+                bn for bn in blocks_to_check if bn in self.tracker.txs_by_block
+            ]))
+
+        # Clean up old canonical blocks to prevent unbounded memory growth
+        self._cleanup_old_canonical_blocks()
+
+    async def _finalize_blocks(self, blocks_to_check: List[int]):
+        """Finalize the given blocks against their canonical blocks, fetching missing ones."""
+        # Fetch all canonical blocks we haven't seen yet in one batched request
+        missing_bns = [
+            bn for bn in blocks_to_check
+            if bn not in self.tracker.canonical_blocks
         ]
+        if missing_bns:
+            fetched = await self.get_blocks_from_rpc(missing_bns)
+            for block in fetched.values():
+                try:
+                    self._record_canonical_block(block)
+                except Exception as e:
+                    self.log(f"Error checking canonical block: {e}")
 
         for block_number in blocks_to_check:
             if block_number not in self.tracker.canonical_blocks:
-                # Canonical block not yet fetched, try to get it
-                block = self.get_block_from_rpc(hex(block_number))
-                if block:
-                    self.check_canonical_block(block)
-                else:
-                    continue
+                # Canonical block still unavailable, retry on the next pass
+                continue
 
             canonical_txs = self.tracker.canonical_blocks.get(block_number, set())
             flashblock_txs = self.tracker.txs_by_block.get(block_number, set())
 
-            confirmed = 0
-            missing = 0
-            missing_hashes = []
+            # Split the block's txs with C-level set operations rather than
+            # probing canonical_txs once per tx in Python
+            confirmed_set = flashblock_txs & canonical_txs
+            missing_set = flashblock_txs - canonical_txs
+            transactions = self.tracker.transactions
 
-            for tx_hash in flashblock_txs:
-                tracked_tx = self.tracker.transactions.get(tx_hash)
-                if not tracked_tx or tracked_tx.status != TxStatus.PENDING:
-                    continue
-
-                if tx_hash in canonical_txs:
+            confirmed = 0
+            for tx_hash in confirmed_set:
+                tracked_tx = transactions.get(tx_hash)
+                if tracked_tx and tracked_tx.status is TxStatus.PENDING:
                     tracked_tx.status = TxStatus.CONFIRMED
-                    self.tracker.total_confirmed += 1
                     confirmed += 1
-                else:
+
+            missing_hashes = []
+            for tx_hash in missing_set:
+                tracked_tx = transactions.get(tx_hash)
+                if tracked_tx and tracked_tx.status is TxStatus.PENDING:
                     tracked_tx.status = TxStatus.MISSING
-                    self.tracker.total_missing += 1
-                    missing += 1
                     missing_hashes.append(tx_hash)
+            missing = len(missing_hashes)
+
+            self.tracker.total_confirmed += confirmed
+            self.tracker.total_missing += missing
 
             if confirmed > 0 or missing > 0:
                 self.log_always(
@@ -408,16 +668,12 @@ class FlashblockReorgTester:
                 # Print one confirmed transaction as example
                 self.log_always(f"\nCONFIRMED TRANSACTION (example):")
                 self.log_always("-" * 40)
-                confirmed_example_printed = False
-                for tx_hash in flashblock_txs:
-                    if tx_hash in canonical_txs and not confirmed_example_printed:
-                        tracked = self.tracker.transactions.get(tx_hash)
-                        idx = tracked.flashblock_index if tracked else "unknown"
-                        self.log_always(f"  [confirmed] {tx_hash}  (flashblock idx={idx})")
-                        confirmed_example_printed = True
-                        break
-
-                if not confirmed_example_printed:
+                confirmed_example = next(iter(confirmed_set), None)
+                if confirmed_example is not None:
+                    tracked = transactions.get(confirmed_example)
+                    idx = tracked.flashblock_index if tracked else "unknown"
+                    self.log_always(f"  [confirmed] {format_tx_hash(confirmed_example)}  (flashblock idx={idx})")
+                else:
                     self.log_always(f"  (no confirmed transactions)")
 
                 self.log_always(f"\nMISSING TRANSACTIONS ({len(missing_hashes)} total):")
@@ -435,7 +691,7 @@ class FlashblockReorgTester:
                 for idx in sorted(missing_by_index.keys()):
                     self.log_always(f"\n  Flashblock index {idx} ({len(missing_by_index[idx])} txs):")
                     for tx_hash in missing_by_index[idx]:
-                        self.log_always(f"    [MISSING] {tx_hash}")
+                        self.log_always(f"    [MISSING] {format_tx_hash(tx_hash)}")
                         break
 
                 # Summary
@@ -453,8 +709,8 @@ class FlashblockReorgTester:
 
             # Clean up finalized transactions to prevent unbounded memory growth
             txs_to_remove = [
-                tx_hash for tx_hash, tx in self.tracker.transactions.items()
-                if tx.block_number == block_number and tx.status != TxStatus.PENDING
+                tx_hash for tx_hash in flashblock_txs
+                if tx_hash in transactions and transactions[tx_hash].status != TxStatus.PENDING
             ]
             for tx_hash in txs_to_remove:
                 del self.tracker.transactions[tx_hash]
@@ -462,9 +718,6 @@ class FlashblockReorgTester:
             if len(txs_to_remove) > 0:
                 self.log(f"Cleaned up {len(txs_to_remove)} finalized transactions from block #{block_number}")
 
-        # Clean up old canonical blocks to prevent unbounded memory growth
-        self._cleanup_old_canonical_blocks()
-
     def _cleanup_old_canonical_blocks(self):
         """Remove old canonical blocks to prevent memory growth."""
         if len(self.tracker.canonical_blocks) <= self.tracker.max_canonical_blocks_to_keep:
@@ -488,24 +741,96 @@ class FlashblockReorgTester:
             )
 
     async def poll_canonical_blocks(self):
-        """Periodically poll RPC for new canonical blocks."""
-        last_block = 0
+        """Periodically poll RPC for new canonical blocks.
 
+        While the newHeads subscription is live this only reconciles missed heads.
+        """
         while self.running:
             try:
-                block = self.get_block_from_rpc("latest")
+                block = await self.get_block_from_rpc("latest")
                 if block:
-                    block_number = int(block.get("number", "0x0"), 16)
-                    if block_number > last_block:
-                        self.check_canonical_block(block)
-                        last_block = block_number
+                    block_number = _hex_to_int(block.get("number", "0x0"))
+                    if block_number > self.tracker.latest_canonical_block:
+                        await self.check_canonical_block(block)
             except ReorgDetectedException:
                 # Reorg detected, stop immediately
                 raise
             except Exception as e:
                 self.log(f"Error polling canonical blocks: {e}")
 
-            await asyncio.sleep(1.5)
+            await asyncio.sleep(10 if self._heads_subscribed else 1.5)
+
+    async def subscribe_new_heads(self):
+        """Subscribe to newHeads on the node's WebSocket RPC and check each new block."""
+        reconnect_delay = 1
+        max_reconnect_delay = 30
+        ws_url = self.rpc_ws_url
+
+        while self.running:
+            try:
+                self.log_always(f"Connecting to RPC WebSocket: {ws_url}")
+
+                async with connect(ws_url, ping_interval=20, ping_timeout=30) as ws:
+                    await ws.send(json.dumps({
+                        "jsonrpc": "2.0",
+                        "id": 1,
+                        "method": "eth_subscribe",
+                        "params": ["newHeads"],
+                    }))
+                    reply = _json_loads(await ws.recv())
+                    if "result" not in reply:
+                        raise WebSocketException(f"eth_subscribe failed: {reply.get('error', reply)}")
+
+                    self.log_always(f"Subscribed to newHeads: {ws_url}")
+                    self._heads_subscribed = True
+                    reconnect_delay = 1  # Reset on successful subscription
+
+                    async for message in ws:
+                        if not self.running:
+                            break
+
+                        try:
+                            head = _json_loads(message).get("params", {}).get("result")
+                            if not isinstance(head, dict):
+                                continue
+
+                            block_number = _hex_to_int(head.get("number", "0x0"))
+                            if block_number <= self.tracker.latest_canonical_block:
+                                continue
+
+                            # Heads carry no tx list, fetch the block's tx hashes
+                            block = await self.get_block_from_rpc(hex(block_number))
+                            if block:
+                                await self.check_canonical_block(block)
+                        except ReorgDetectedException:
+                            # Reorg detected, stop immediately
+                            raise
+                        except Exception as e:
+                            self.log(f"Error processing newHeads message: {e}")
+
+            except ConnectionClosed as e:
+                self.log_always(
+                    f"RPC WebSocket {ws_url} closed: {e}. "
+                    f"Falling back to polling, reconnecting in {reconnect_delay}s..."
+                )
+            except WebSocketException as e:
+                self.log_always(
+                    f"RPC WebSocket {ws_url} error: {e}. "
+                    f"Falling back to polling, reconnecting in {reconnect_delay}s..."
+                )
+            except ReorgDetectedException:
+                raise
+            except Exception as e:
+                self.log_always(
+                    f"RPC WebSocket {ws_url} unexpected error: {e}. "
+                    f"Falling back to polling, reconnecting in {reconnect_delay}s..."
+                )
+            finally:
+                self._heads_subscribed = False
+
+            if self.running:
+                await asyncio.sleep(reconnect_delay)
+                reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
 
     async def subscribe_flashblocks_single(self, ws_url: str):
         """Subscribe to a single flashblocks WebSocket and process messages."""
@@ -525,17 +850,17 @@ class FlashblockReorgTester:
                             break
 
                         try:
-                            data = json.loads(message)
+                            data = _json_loads(message)
 
                             # Direct flashblock payload format (not JSON-RPC wrapped)
                             # Has payload_id, index, base (for index 0), diff
-                            if "payload_id" in data and "diff" in data:
-                                self.process_flashblock_payload(data, source_url=ws_url)
+                            if data.get("payload_id") is not None and data.get("diff") is not None:
+                                await self.process_flashblock_payload(data, source_url=ws_url)
                             # JSON-RPC subscription format (fallback)
-                            elif "params" in data and "result" in data["params"]:
-                                result = data["params"]["result"]
+                            elif isinstance(params := data.get("params"), dict):
+                                result = params.get("result")
                                 if isinstance(result, dict):
-                                    self.process_flashblock_payload(result, source_url=ws_url)
+                                    await self.process_flashblock_payload(result, source_url=ws_url)
 
                         except json.JSONDecodeError:
                             self.log(f"Failed to parse WebSocket message from {ws_url}")
@@ -613,6 +938,7 @@ class FlashblockReorgTester:
         print("=" * 60)
         print(f"WebSocket URLs: {', '.join(self.ws_urls)}")
         print(f"RPC URL: {self.rpc_url}")
+        print(f"RPC WebSocket URL (newHeads): {self.rpc_ws_url or 'disabled, polling only'}")
         print(f"Duration: {'unlimited' if self.duration is None else f'{self.duration}s'}")
         print(f"Verbose: {self.verbose}")
         print()
@@ -624,12 +950,17 @@ class FlashblockReorgTester:
         print("=" * 60)
         print()
 
+        if HAS_AIOHTTP:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+
         # Create tasks - one subscriber per WebSocket URL
         tasks = [
             asyncio.create_task(self.subscribe_flashblocks_single(url))
             for url in self.ws_urls
         ]
         tasks.append(asyncio.create_task(self.poll_canonical_blocks()))
+        if self.rpc_ws_url:
+            tasks.append(asyncio.create_task(self.subscribe_new_heads()))
 
         # Add duration limit if specified
         if self.duration:
@@ -647,6 +978,8 @@ class FlashblockReorgTester:
             pass
         finally:
             self.running = False
+            if self._http is not None:
+                await self._http.close()
             self.print_summary()
 
 
@@ -665,6 +998,11 @@ def main():
         default="http://localhost:8124",
         help="Ethereum RPC URL (default: http://localhost:8124)",
     )
+    parser.add_argument(
+        "--rpc-ws-url",
+        default=None,
+        help="Ethereum WebSocket RPC URL to subscribe to newHeads (default: poll --rpc-url only)",
+    )
     parser.add_argument(
         "--duration",
         type=int,
@@ -685,6 +1023,7 @@ def main():
         rpc_url=args.rpc_url,
         duration=args.duration,
         verbose=args.verbose,
+        rpc_ws_url=args.rpc_ws_url,
     )
 
     # Handle graceful shutdown
@@ -696,7 +1035,13 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        asyncio.run(tester.run())
+        if HAS_UVLOOP and hasattr(uvloop, "run"):
+            uvloop.run(tester.run())
+        else:
+            if HAS_UVLOOP:
+                # uvloop < 0.18 has no run(); install() is its older entry point
+                uvloop.install()
+            asyncio.run(tester.run())
     except KeyboardInterrupt:
         pass
 